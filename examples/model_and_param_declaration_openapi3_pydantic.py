@@ -1,8 +1,8 @@
-import json
+import functools
 from enum import Enum
 from typing import Any, Dict, List, Optional, Type, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from tornado import version_info
 import tornado.ioloop
 import tornado.options
@@ -50,6 +50,12 @@ class ErrorResponse(BaseModel):
     description: str = Field(..., example="error")
 
 
+# module-level adapters reuse one cached serializer instead of going
+# through the deprecated BaseModel.json() wrapper on every request
+_CALC_RESP_TA = TypeAdapter(CalculusResponse)
+_ERR_TA = TypeAdapter(ErrorResponse)
+
+
 class TestHandlerWithoutSwagger(tornado.web.RequestHandler):
     def get(self):
         self.write({"status": "ok"})
@@ -100,10 +106,15 @@ class CalculusHandler(tornado.web.RequestHandler):
         if result < 0:
             self.set_status(400)
             response = ErrorResponse(description="Why so negative")
-            self.write(response.json())
+            self.write(_ERR_TA.dump_json(response))
             return
         response = CalculusResponse(result=result, you_are_cool=query_model.i_am_cool)
-        self.write(response.json(exclude_none=True))
+        self.write(_CALC_RESP_TA.dump_json(response, exclude_none=True))
+
+
+@functools.lru_cache(maxsize=None)
+def _type_adapter(model_type: Type[T]) -> TypeAdapter:
+    return TypeAdapter(model_type)
 
 
 def parse_query_params(query_params: Dict[str, Any], model_type: Type[T]) -> T:
@@ -111,16 +122,12 @@ def parse_query_params(query_params: Dict[str, Any], model_type: Type[T]) -> T:
         key: value[0].decode("utf-8") if isinstance(value, list) else value.decode("utf-8")
         for key, value in query_params.items()
     }
-    return model_type(**flattened_params)
+    return _type_adapter(model_type).validate_python(flattened_params)
 
 
 def parse_body_params(body: bytes, model_type: Type[T]) -> T:
-    try:
-        body_data = json.loads(body.decode("utf-8"))
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON body: {e}")
-
-    return model_type(**body_data)
+    # pydantic-core parses the raw bytes directly, skipping a json.loads round-trip
+    return _type_adapter(model_type).validate_json(body)
 
 
 class Application(tornado.web.Application):
@@ -1,14 +1,16 @@
 # pylint: disable=R0401,C0415
 """Builders"""
 import abc
-import collections
+import functools
 import inspect
 import os
 import re
 import typing
 import warnings
+import weakref
 
 from pydantic import BaseModel
+from pydantic.json_schema import models_json_schema
 import tornado.web
 import yaml
 
@@ -22,6 +24,13 @@ SWAGGER_TEMPLATE = os.path.abspath(
 )
 SWAGGER_DOC_SEPARATOR = "---"
 
+_BRACKETS_RE = re.compile(r"\(.*?\)")
+
+# libyaml-backed loader parses docstrings considerably faster when available
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_BOUND_PARAMS = frozenset(("self", "cls"))
+
 
 PYTHON_TO_OPENAPI_MAPPER = {
     int: {"type": "integer", "format": "int32"},
@@ -40,11 +49,21 @@ def input_parameters_getter(
         some_callable: typing.Callable
 ) -> typing.List[typing.Dict[str, typing.Type]]:
     """Parse handler input parameters"""
+    code = getattr(some_callable, "__code__", None)
+    if (
+        code is not None
+        and code.co_argcount <= 1
+        and not code.co_kwonlyargcount
+        and not code.co_flags & (inspect.CO_VARARGS | inspect.CO_VARKEYWORDS)
+    ):
+        # only a bound argument at most: no need to build a Signature
+        return []
+
     signature = inspect.signature(some_callable)
     parameters = []
 
     for name, param in signature.parameters.items():
-        if name in ("self", "cls"):
+        if name in _BOUND_PARAMS:
             continue
 
         parameters.append({"name": name, "type": param.annotation})
@@ -54,14 +73,11 @@ def input_parameters_getter(
 
 def _extract_swagger_definition(endpoint_doc: str):
     """Extract swagger definition after SWAGGER_DOC_SEPARATOR"""
-    endpoint_doc = endpoint_doc.splitlines()
-
-    for i, doc_line in enumerate(endpoint_doc):
-        if SWAGGER_DOC_SEPARATOR in doc_line:
-            end_point_swagger_start = i + 1
-            endpoint_doc = endpoint_doc[end_point_swagger_start:]
-            break
-    return "\n".join(endpoint_doc)
+    _, separator, swagger_doc = endpoint_doc.partition(SWAGGER_DOC_SEPARATOR)
+    if not separator:
+        return endpoint_doc
+    # drop the remainder of the separator line itself
+    return swagger_doc.partition("\n")[2]
 
 
 def build_swagger_docs(endpoint_doc: str):
@@ -71,7 +87,7 @@ def build_swagger_docs(endpoint_doc: str):
     # Build JSON YAML Obj
     try:
         endpoint_doc = endpoint_doc.replace("\t", "    ")  # fix windows tabs bug
-        end_point_swagger_doc = yaml.safe_load(endpoint_doc)
+        end_point_swagger_doc = yaml.load(endpoint_doc, Loader=_YAML_LOADER)
         if not isinstance(end_point_swagger_doc, dict):
             raise yaml.YAMLError()
         return end_point_swagger_doc
@@ -82,74 +98,138 @@ def build_swagger_docs(endpoint_doc: str):
         }
 
 
+# weak keys keep the caches from pinning handler methods alive
+_unwrapped_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_args_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _unwrap_cached(func):
+    """inspect.unwrap memoized per function object"""
+    try:
+        return _unwrapped_cache[func]
+    except (KeyError, TypeError):
+        pass
+
+    unwrapped = inspect.unwrap(func)
+    try:
+        _unwrapped_cache[func] = unwrapped
+    except TypeError:  # not weak-referenceable
+        pass
+    return unwrapped
+
+
 def _try_extract_doc(func):
     """Extract docstring from origin function removing decorators"""
-    return inspect.unwrap(func).__doc__
+    return _unwrap_cached(func).__doc__
+
+
+@functools.lru_cache(maxsize=None)
+def _supported_methods_lower(supported_methods: typing.Tuple[str, ...]) -> typing.Tuple[str, ...]:
+    """Lowercase SUPPORTED_METHODS once per distinct tuple instead of per route"""
+    return tuple(method.lower() for method in supported_methods)
 
 
 def _build_doc_from_func_doc(handler):
     out = {}
 
-    for method in handler.SUPPORTED_METHODS:
-        method = method.lower()
-        doc = _try_extract_doc(getattr(handler, method))
+    for method in _supported_methods_lower(tuple(handler.SUPPORTED_METHODS)):
+        method_callable = getattr(handler, method)
+        # functools.wraps copies __doc__ onto wrappers, so a missing doc with
+        # no __wrapped__ chain means there is nothing to unwrap
+        if method_callable.__doc__ is None and not hasattr(method_callable, "__wrapped__"):
+            continue
+
+        doc = _try_extract_doc(method_callable)
 
         if doc is not None and "---" in doc:
-            out.update({method: build_swagger_docs(doc)})
+            out[method] = build_swagger_docs(doc)
 
     return out
 
 
 class PydanticRoutesProcessor:
     def __init__(self):
-        self.paths = collections.defaultdict(dict)
-        self.components = {
+        self.paths: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        # components section of the generated OpenAPI spec
+        self.components: typing.Dict[str, typing.Dict[str, typing.Any]] = {
                 "schemas": {},
                 "parameters": {},
             }
 
     def extract_paths_pydantic(self, routes):
+        handler_methods = []
+        models = {}  # dict used as ordered set
+
         for route in routes:
-            tornado_route = tornado.web.url(*route)
-            for method_name, method_description in self._build_doc_from_pydantic_handler(
+            tornado_route = route if isinstance(route, tornado.web.URLSpec) else tornado.web.url(*route)
+            for method_name, swagger_info, input_parameters in self._iter_pydantic_methods(
                     tornado_route.target
-            ).items():
+            ):
                 path_handler = _format_handler_path(tornado_route, method_name)
                 if path_handler is None:
                     continue
 
-                self.paths[path_handler].update({method_name: method_description})
+                handler_methods.append((path_handler, method_name, swagger_info, input_parameters))
+                if swagger_info.request:
+                    models[swagger_info.request] = None
+                if swagger_info.query:
+                    models[swagger_info.query] = None
+                for response_model in swagger_info.responses.values():
+                    models[response_model["model"]] = None
+
+        schemas = self._build_model_schemas(models)
+
+        for path_handler, method_name, swagger_info, input_parameters in handler_methods:
+            self.paths.setdefault(path_handler, {})[method_name] = self.build_pydantic_docs(
+                input_parameters,
+                swagger_info.responses,
+                schemas,
+                swagger_info.request,
+                swagger_info.query,
+                swagger_info.tags,
+            )
 
         return self.paths, self.components
 
-    def _build_doc_from_pydantic_handler(self, handler):
-        out = {}
-
-        for method_name in handler.SUPPORTED_METHODS:
-            method_name = method_name.lower()
+    @staticmethod
+    def _iter_pydantic_methods(handler):
+        """Yield (method_name, swagger_info, input_parameters) for decorated handler methods"""
+        for method_name in _supported_methods_lower(tuple(handler.SUPPORTED_METHODS)):
             method_callable = getattr(handler, method_name)
             swagger_info: "SwaggerMethodInfo" = getattr(method_callable, "_swagger_info", None)
             if swagger_info:
-                response_models = swagger_info.responses
-                request_model = swagger_info.request
-                query_params = swagger_info.query
-                tags = swagger_info.tags
-                input_parameters = input_parameters_getter(method_callable)
-                out.update(
-                    {
-                        method_name: self.build_pydantic_docs(
-                            input_parameters, response_models, request_model, query_params, tags,
-                        )
-                    }
-                )
-
-        return out
+                yield method_name, swagger_info, input_parameters_getter(method_callable)
+
+    def _build_model_schemas(
+        self, models: typing.Iterable[typing.Type[BaseModel]]
+    ) -> typing.Dict[typing.Type[BaseModel], typing.Dict[str, typing.Any]]:
+        """Generate JSON schemas for all referenced models in one batch"""
+        models = list(models)
+        if not models:
+            return {}
+
+        schemas_map, definitions = models_json_schema(
+            [(model, "validation") for model in models],
+            by_alias=False,
+            ref_template="#/components/schemas/{model}",
+        )
+        self._add_components_from_definitions(definitions.get("$defs", {}))
+        return {model: schemas_map[(model, "validation")] for model in models}
+
+    def _resolve_schema(self, schema_ref: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        """Resolve a $ref produced by the batch schema build into its components entry"""
+        definition_name = schema_ref["$ref"].rsplit("/", 1)[-1]
+        return self.components["schemas"][definition_name]
 
     def _add_components_from_definitions(self, definitions: typing.Dict[str, typing.Any]):
         # could cause conflicts for classes with same name
+        schemas = self.components["schemas"]
+        if not schemas:
+            schemas.update(definitions)
+            return
+
         for definition_name, definition_spec in definitions.items():
-            if definition_name not in self.components["schemas"]:
-                self.components["schemas"][definition_name] = definition_spec
+            schemas.setdefault(definition_name, definition_spec)
 
     @staticmethod
     def _generate_default_description(status_code: int) -> str:
@@ -163,25 +243,22 @@ class PydanticRoutesProcessor:
         self,
         input_parameters: typing.List[typing.Dict[str, typing.Any]],
         response_models: typing.Dict[int, typing.Dict[str, typing.Any]],
+        schemas: typing.Dict[typing.Type[BaseModel], typing.Dict[str, typing.Any]],
         request: typing.Optional[typing.Type[BaseModel]] = None,
         query: typing.Optional[typing.Type[BaseModel]] = None,
         tags: typing.Optional[typing.List[str]] = None,
     ):
         result = {}
 
-        parameters = self._build_input_and_query_doc(input_parameters, query)
+        parameters = self._build_input_and_query_doc(input_parameters, schemas, query)
         if parameters:
             result["parameters"] = parameters
 
         if request:
-            model_spec = request.schema(by_alias=False, ref_template="#/components/schemas/{model}")
-            if "definitions" in model_spec:
-                self._add_components_from_definitions(model_spec.pop("definitions"))
-
             result["requestBody"] = {
                 "content": {
                     "application/json": {
-                        "schema": model_spec
+                        "schema": schemas[request]
                     }
                 },
                 "required": True
@@ -193,20 +270,12 @@ class PydanticRoutesProcessor:
             description = response_model.get("description", None)
             if not description:
                 description = self._generate_default_description(status_code)
-            model_spec = model.schema(by_alias=False, ref_template="#/components/schemas/{model}")
-            model_name = model.__name__
-            # could cause conflicts for classes with same name
-            if model_name not in self.components["schemas"]:
-                self.components["schemas"][model_name] = model_spec
-
-            if "definitions" in model_spec:
-                self._add_components_from_definitions(model_spec.pop("definitions"))
 
             responses[status_code] = {
                 "description": description,
                 "content": {
                     "application/json": {
-                        "schema": {"$ref": f"#/components/schemas/{model_name}"},
+                        "schema": schemas[model],
                     }
                 }
             }
@@ -217,39 +286,26 @@ class PydanticRoutesProcessor:
             result["tags"] = tags
         return result
 
-    @staticmethod
-    def _build_request_body_doc(model: BaseModel) -> dict:
-        model_schema = model.schema(by_alias=False, ref_template="#/components/schemas/{model}")
-
-        request_body = {
-            "content": {
-                "application/json": {
-                    "schema": model_schema
-                }
-            },
-            "required": True
-        }
-
-        return request_body
-
-    @staticmethod
     def _build_input_and_query_doc(
+        self,
         input_parameters: typing.List[typing.Dict[str, typing.Any]],
+        schemas: typing.Dict[typing.Type[BaseModel], typing.Dict[str, typing.Any]],
         query: typing.Optional[typing.Type[BaseModel]] = None,
     ) -> typing.List[typing.Dict[str, typing.Any]]:
         parameters = []
 
         if input_parameters:
+            openapi_types = PYTHON_TO_OPENAPI_MAPPER
             for input_parameter in input_parameters:
                 parameters.append({
                     "in": "path",
                     "required": True,
                     "name": input_parameter["name"],
-                    "schema": PYTHON_TO_OPENAPI_MAPPER[input_parameter["type"]],
+                    "schema": openapi_types[input_parameter["type"]],
                 })
 
         if query:
-            query_schema = query.schema(by_alias=False, ref_template="#/components/schemas/{model}")
+            query_schema = self._resolve_schema(schemas[query])
             for parameter_name, schema in query_schema["properties"].items():
                 parameters.append({
                     "in": "query",
@@ -263,7 +319,17 @@ class PydanticRoutesProcessor:
 
 def _try_extract_args(method_handler):
     """Extract method args from origin function removing decorators"""
-    return inspect.getfullargspec(inspect.unwrap(method_handler)).args[1:]
+    try:
+        return _args_cache[method_handler]
+    except (KeyError, TypeError):
+        pass
+
+    args = inspect.getfullargspec(_unwrap_cached(method_handler)).args[1:]
+    try:
+        _args_cache[method_handler] = args
+    except TypeError:  # not weak-referenceable
+        pass
+    return args
 
 
 def _extract_parameters_names(handler, parameters_count, method):
@@ -284,51 +350,59 @@ def _extract_parameters_names(handler, parameters_count, method):
 
 
 def _format_handler_path(route, method):
-    brackets_regex = re.compile(r"\(.*?\)")
     parameters = _extract_parameters_names(route.target, route.regex.groups, method)
     route_pattern = route.regex.pattern
-    brackets = brackets_regex.findall(route_pattern)
 
-    if len(brackets) != len(parameters):
+    if len(_BRACKETS_RE.findall(route_pattern)) != len(parameters):
         warnings.warn("Illegal route. route.regex.groups does not match all parameters. Route = " + str(route))
         return None
 
-    for i, entity in enumerate(brackets):
-        route_pattern = route_pattern.replace(entity, "{%s}" % parameters[i], 1)
+    parameters_left = iter(parameters)
+    route_pattern = _BRACKETS_RE.sub(lambda match: "{%s}" % next(parameters_left), route_pattern)
 
     return route_pattern[:-1]
 
 
 def nesteddict2yaml(d, indent=10, result=""):
-    for key, value in d.items():
-        result += " " * indent + str(key) + ":"
+    lines = [result]
+    stack = [(key, value, indent) for key, value in reversed(list(d.items()))]
+
+    while stack:
+        key, value, current_indent = stack.pop()
         if isinstance(value, dict):
-            result = nesteddict2yaml(value, indent + 2, result + "\n")
+            lines.append(" " * current_indent + str(key) + ":\n")
+            stack.extend(
+                (nested_key, nested_value, current_indent + 2)
+                for nested_key, nested_value in reversed(list(value.items()))
+            )
         else:
-            result += " " + str(value) + "\n"
-    return result
+            lines.append(" " * current_indent + str(key) + ": " + str(value) + "\n")
+
+    return "".join(lines)
 
 
 def _clean_description(description: str):
     """Remove empty space from description begin"""
-    _start_desc = 0
-    for i, word in enumerate(description):
-        if word != "\n":
-            _start_desc = i
-            break
-    return "    ".join(description[_start_desc:].splitlines())
+    return "    ".join(description.lstrip("\n").splitlines())
 
 
 def _extract_paths(routes):
-    paths = collections.defaultdict(dict)
+    paths = {}
+    # handlers registered under several routes (as setup_swagger itself does
+    # for the UI) only get their docstrings parsed once
+    handler_docs = {}
 
     for route in routes:
-        for method_name, method_description in _build_doc_from_func_doc(route.target).items():
+        docs = handler_docs.get(route.target)
+        if docs is None:
+            docs = handler_docs[route.target] = _build_doc_from_func_doc(route.target)
+
+        for method_name, method_description in docs.items():
             path_handler = _format_handler_path(route, method_name)
             if path_handler is None:
                 continue
 
-            paths[path_handler].update({method_name: method_description})
+            paths.setdefault(path_handler, {})[method_name] = method_description
 
     return paths
 
@@ -384,27 +458,22 @@ class Swagger2DocBuilder(BaseDocBuilder):
         parameters
     ):
         """Generate docs"""
-        swagger_spec = {
+        return {
             "swagger": "2.0",
             "info": {
                 "title": title,
                 "description": _clean_description(description),
                 "version": api_version,
+                **({"contact": {"name": contact}} if contact else {}),
             },
             "basePath": api_base_url,
             "schemes": schemes,
             "definitions": models,
             "parameters": parameters,
             "paths": _extract_paths(routes),
+            **({"securityDefinitions": security_definitions} if security_definitions else {}),
+            **({"security": security} if security else {}),
         }
-        if contact:
-            swagger_spec["info"]["contact"] = {"name": contact}
-        if security_definitions:
-            swagger_spec["securityDefinitions"] = security_definitions
-        if security:
-            swagger_spec["security"] = security
-
-        return swagger_spec
 
 
 class OpenApiDocBuilder(BaseDocBuilder):
@@ -431,12 +500,13 @@ class OpenApiDocBuilder(BaseDocBuilder):
         parameters
     ):
         """Generate docs"""
-        swagger_spec = {
+        return {
             "openapi": "3.0.3",
             "info": {
                 "title": title,
                 "description": _clean_description(description),
                 "version": api_version,
+                **({"contact": {"name": contact}} if contact else {}),
             },
             "servers": [{"url": api_base_url}],
             "components": {
@@ -444,17 +514,10 @@ class OpenApiDocBuilder(BaseDocBuilder):
                 "parameters": parameters,
             },
             "paths": _extract_paths(routes),
+            **({"securityDefinitions": security_definitions} if security_definitions else {}),
+            **({"security": security} if security else {}),
         }
 
-        if contact:
-            swagger_spec["info"]["contact"] = {"name": contact}
-        if security_definitions:
-            swagger_spec["securityDefinitions"] = security_definitions
-        if security:
-            swagger_spec["security"] = security
-
-        return swagger_spec
-
 
 class PydanticBuilder(BaseDocBuilder):
     """OpenAPI 3 Schema builder with pydantic support"""
@@ -480,28 +543,23 @@ class PydanticBuilder(BaseDocBuilder):
         parameters
     ):
         """Generate docs"""
-        swagger_spec = {
+        routes_processor = PydanticRoutesProcessor()
+        paths, components = routes_processor.extract_paths_pydantic(routes)
+
+        return {
             "openapi": "3.0.3",
             "info": {
                 "title": title,
                 "description": _clean_description(description),
                 "version": api_version,
+                **({"contact": {"name": contact}} if contact else {}),
             },
             "servers": [{"url": api_base_url}],
+            "components": components,
+            "paths": paths,
+            **({"securityDefinitions": security_definitions} if security_definitions else {}),
+            **({"security": security} if security else {}),
         }
-        routes_processor = PydanticRoutesProcessor()
-        paths, components = routes_processor.extract_paths_pydantic(routes)
-        swagger_spec["components"] = components
-        swagger_spec["paths"] = paths
-
-        if contact:
-            swagger_spec["info"]["contact"] = {"name": contact}
-        if security_definitions:
-            swagger_spec["securityDefinitions"] = security_definitions
-        if security:
-            swagger_spec["security"] = security
-
-        return swagger_spec
 
 
 doc_builders = {b.schema: b for b in [Swagger2DocBuilder(), OpenApiDocBuilder(), PydanticBuilder()]}
@@ -22,10 +22,12 @@ class SwaggerUiHandler(TornadoBaseHandler):
 
 
 class SwaggerSpecHandler(TornadoBaseHandler):
-    SWAGGER_SPEC = ""
+    # JSON pre-serialized once in setup_swagger instead of per request
+    SWAGGER_SPEC: bytes = b"{}"
     allow_cors: bool = False
 
     def get(self):
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
         self.write(self.SWAGGER_SPEC)
         
     def options(self):
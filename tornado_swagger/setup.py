@@ -1,7 +1,8 @@
 """Setup"""
+import json
 import os
+import re
 import typing
-from dataclasses import dataclass
 
 import tornado.web
 from pydantic import BaseModel
@@ -12,6 +13,8 @@ from tornado_swagger.const import API_SWAGGER_2
 
 STATIC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "swagger_ui"))
 
+_UI_PLACEHOLDER_RE = re.compile(r"\{\{ (SWAGGER_URL|DISPLAY_MODELS) \}\}")
+
 
 def export_swagger(
     routes: typing.List[tornado.web.URLSpec],
@@ -41,12 +44,22 @@ def export_swagger(
     )
 
 
-@dataclass
 class SwaggerMethodInfo:
-    responses: typing.Dict[int, typing.Dict[str, typing.Any]]
-    request: typing.Optional[typing.Type[BaseModel]] = None
-    query: typing.Optional[typing.Type[BaseModel]] = None
-    tags: typing.Optional[typing.List[str]] = None
+    """Swagger metadata attached to handler methods by swagger_decorator"""
+
+    __slots__ = ("responses", "request", "query", "tags")
+
+    def __init__(
+        self,
+        responses: typing.Dict[int, typing.Dict[str, typing.Any]],
+        request: typing.Optional[typing.Type[BaseModel]] = None,
+        query: typing.Optional[typing.Type[BaseModel]] = None,
+        tags: typing.Optional[typing.List[str]] = None,
+    ):
+        self.responses = responses
+        self.request = request
+        self.query = query
+        self.tags = tags
 
 
 def swagger_decorator(
@@ -102,11 +115,15 @@ def setup_swagger(
         tornado.web.url(_swagger_spec_url, SwaggerSpecHandler),
     ]
 
-    SwaggerSpecHandler.SWAGGER_SPEC = swagger_schema
+    SwaggerSpecHandler.SWAGGER_SPEC = json.dumps(swagger_schema).encode("utf-8")
     SwaggerSpecHandler.allow_cors = allow_cors
     SwaggerUiHandler.allow_cors = allow_cors
 
+    substitutions = {
+        "SWAGGER_URL": _swagger_spec_url,
+        "DISPLAY_MODELS": str(-1 if not display_models else 1),
+    }
     with open(os.path.join(STATIC_PATH, "ui.html"), "r", encoding="utf-8") as f:
-        SwaggerUiHandler.SWAGGER_HOME_TEMPLATE = (
-            f.read().replace("{{ SWAGGER_URL }}", _swagger_spec_url).replace("{{ DISPLAY_MODELS }}", str(-1 if not display_models else 1))
+        SwaggerUiHandler.SWAGGER_HOME_TEMPLATE = _UI_PLACEHOLDER_RE.sub(
+            lambda match: substitutions[match.group(1)], f.read()
         )